@@ -1,52 +1,239 @@
+import io
 import os
+import re
+import sys
+import hashlib
+import shutil
+import tempfile
+import threading
+import multiprocessing
 import fitz
-import pdfplumber
-from typing import List, Dict, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from langchain.schema import Document
+from .text_splitter import FastSplitter
+
+# Product names almost always appear on the cover or table of contents.
+PRODUCT_DETECTION_CHARS = 65536
+
+# Minimum pages per worker when a single PDF is split across processes;
+# below that, process startup and IPC cost more than they save.
+PARALLEL_PAGE_THRESHOLD = 8
+
+# Single source of truth for product detection, in priority order: earlier
+# products win when several are mentioned. "inner range" tolerates line
+# breaks and underscores so split cover pages and filenames both match.
+PRODUCT_PATTERNS = [
+    ("everbridge", r"everbridge"),
+    ("inner_range", r"inner[\s_]*range"),
+    ("milestone", r"milestone"),
+]
+
+PRODUCT_PRIORITY = [product for product, _ in PRODUCT_PATTERNS]
+
+PRODUCT_RE = re.compile(
+    "|".join(f"({pattern})" for _, pattern in PRODUCT_PATTERNS),
+    re.IGNORECASE
+)
+
+# Each pool worker builds its own DocumentProcessor once at startup, so
+# tasks only ship their arguments instead of a pickled processor.
+_WORKER_PROCESSOR = None
+
+def _init_worker(chunk_size: int, chunk_overlap: int, cache_dir: str, max_cache_bytes: int):
+    global _WORKER_PROCESSOR
+    # Workers extract serially; they never start a pool of their own.
+    _WORKER_PROCESSOR = DocumentProcessor(
+        chunk_size, chunk_overlap, cache_dir, max_workers=1, max_cache_bytes=max_cache_bytes
+    )
+
+def _run_in_worker(method_name: str, args: tuple) -> List[Document]:
+    return getattr(_WORKER_PROCESSOR, method_name)(*args)
+
+def _open_pdf(source):
+    # source is a file path or the raw bytes of a PDF.
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+def _extract_page_range(source, start: int, stop: int) -> List[str]:
+    doc = _open_pdf(source)
+    try:
+        return [doc[i].get_text("text") for i in range(start, stop)]
+    finally:
+        doc.close()
 
 class DocumentProcessor:
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
+    def __init__(self,
+                 chunk_size: int = 1000,
+                 chunk_overlap: int = 200,
+                 cache_dir: str = "./data/pdfcache",
+                 max_workers: Optional[int] = None,
+                 max_cache_bytes: int = 256 * 1024 * 1024):
+        self.text_splitter = FastSplitter(
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""]
+            chunk_overlap=chunk_overlap
         )
         self.supported_products = ["everbridge", "inner_range", "milestone", "general"]
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.max_workers = max_workers
+        
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+    
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        digest = hashlib.blake2b()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _write_text_cache(self, cache_path: str, text: str):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Error writing PDF text cache: {e}")
+            return
+        
+        self._evict_text_cache()
+    
+    def _evict_text_cache(self):
+        # Reads bump a file's mtime, so deleting the oldest mtimes first
+        # keeps the cache least-recently-used within max_cache_bytes.
+        try:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".txt"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_cache_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        except Exception as e:
+            print(f"Error evicting PDF text cache: {e}")
+    
+    def clear_cache(self):
+        try:
+            if os.path.exists(self.cache_dir):
+                shutil.rmtree(self.cache_dir)
+        except Exception as e:
+            print(f"Error clearing PDF text cache: {e}")
+    
+    def _cached_extract(self, digest: str, extract) -> str:
+        cache_path = os.path.join(self.cache_dir, f"{digest}.txt")
+        
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(cache_path)
+            return text
+        except FileNotFoundError:
+            pass
+        
+        text = extract()
+        self._write_text_cache(cache_path, text)
+        return text
     
     def extract_text_from_pdf(self, file_path: str) -> str:
-        text = ""
+        return self._cached_extract(
+            self._file_digest(file_path),
+            lambda: self._extract_text_uncached(file_path)
+        )
+    
+    def extract_text_from_pdf_bytes(self, data: bytes) -> str:
+        return self._cached_extract(
+            hashlib.blake2b(data).hexdigest(),
+            lambda: self._extract_text_uncached(data)
+        )
+    
+    def _extract_text_uncached(self, source) -> str:
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            return self._extract_pages(source)
         except Exception as e:
-            print(f"Error with pdfplumber: {e}, trying PyMuPDF...")
+            print(f"Error with PyMuPDF: {e}, trying pdfplumber...")
             try:
-                doc = fitz.open(file_path)
-                for page in doc:
-                    text += page.get_text() + "\n"
-                doc.close()
+                import pdfplumber
+                if isinstance(source, (bytes, bytearray)):
+                    source = io.BytesIO(source)
+                parts = []
+                with pdfplumber.open(source) as pdf:
+                    for page in pdf.pages:
+                        page_text = page.extract_text()
+                        if page_text:
+                            parts.append(page_text)
+                return "\n".join(parts).strip()
             except Exception as e2:
-                print(f"Error with PyMuPDF: {e2}")
+                print(f"Error with pdfplumber: {e2}")
                 raise Exception(f"Could not extract text from PDF: {e2}")
+    
+    def _extract_pages(self, source) -> str:
+        # PyMuPDF does not support concurrent use from multiple threads, so
+        # large PDFs are split into page ranges across processes instead,
+        # each opening its own copy of the document.
+        doc = _open_pdf(source)
+        try:
+            page_count = doc.page_count
+            workers = min(
+                self.max_workers or os.cpu_count() or 1,
+                page_count // PARALLEL_PAGE_THRESHOLD
+            )
+            if workers < 2:
+                return "\n".join(page.get_text("text") for page in doc).strip()
+        finally:
+            doc.close()
+        
+        return "\n".join(self._extract_pages_in_pool(source, page_count, workers)).strip()
+    
+    def _extract_pages_in_pool(self, source, page_count: int, workers: int) -> List[str]:
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        pool = self._get_pool(workers)
+        futures = [
+            pool.submit(_extract_page_range, source, start, stop)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
         
-        return text.strip()
+        parts = []
+        try:
+            for future in futures:
+                parts.extend(future.result())
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+        return parts
+    
+    def _find_products(self, text: str) -> set:
+        found = set()
+        for match in PRODUCT_RE.finditer(text):
+            found.add(PRODUCT_PRIORITY[match.lastindex - 1])
+            if len(found) == len(PRODUCT_PRIORITY):
+                break
+        return found
     
     def detect_product_type(self, text: str, filename: str) -> str:
-        text_lower = text.lower()
-        filename_lower = filename.lower()
-        
-        if "everbridge" in text_lower or "everbridge" in filename_lower:
-            return "everbridge"
-        elif "inner range" in text_lower or "inner_range" in filename_lower or "innerrange" in filename_lower:
-            return "inner_range"
-        elif "milestone" in text_lower or "milestone" in filename_lower:
-            return "milestone"
-        else:
-            return "general"
+        found = self._find_products(text[:PRODUCT_DETECTION_CHARS])
+        found |= self._find_products(filename)
+        
+        for product in PRODUCT_PRIORITY:
+            if product in found:
+                return product
+        return "general"
     
     def process_document(self, file_path: str, product_type: str = None) -> List[Document]:
         if not os.path.exists(file_path):
@@ -56,45 +243,161 @@ class DocumentProcessor:
             raise ValueError("Currently only PDF files are supported")
         
         text = self.extract_text_from_pdf(file_path)
+        return self._build_documents(text, os.path.basename(file_path), file_path, product_type)
+    
+    def process_document_bytes(self, data: bytes, filename: str, product_type: str = None) -> List[Document]:
+        if not filename.lower().endswith('.pdf'):
+            raise ValueError("Currently only PDF files are supported")
         
+        text = self.extract_text_from_pdf_bytes(data)
+        return self._build_documents(text, filename, filename, product_type)
+    
+    def _build_documents(self, text: str, filename: str, file_path: str, product_type: str = None) -> List[Document]:
         if not text.strip():
             raise ValueError("No text could be extracted from the PDF")
         
-        filename = os.path.basename(file_path)
-        
         if product_type is None:
             product_type = self.detect_product_type(text, filename)
         
-        chunks = self.text_splitter.split_text(text)
+        # Short SOPs fit in one chunk; skip the splitter entirely.
+        if len(text) <= self.text_splitter._chunk_size:
+            chunks = [text.strip()]
+        else:
+            chunks = self.text_splitter.split_text(text)
+        
+        # Interned so every chunk's metadata shares the same string objects.
+        base_metadata = {
+            "source": sys.intern(filename),
+            "file_path": sys.intern(file_path),
+            "product_type": sys.intern(product_type),
+        }
+        total_chunks = len(chunks)
         
         documents = []
         for i, chunk in enumerate(chunks):
-            metadata = {
-                "source": filename,
-                "file_path": file_path,
-                "product_type": product_type,
-                "chunk_index": i,
-                "total_chunks": len(chunks)
-            }
+            metadata = {**base_metadata, "chunk_index": i, "total_chunks": total_chunks}
             documents.append(Document(page_content=chunk, metadata=metadata))
         
         return documents
     
-    def process_multiple_documents(self, file_paths: List[str], product_types: Dict[str, str] = None) -> List[Document]:
-        all_documents = []
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_pool_workers"] = 0
+        del state["_pool_lock"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+    
+    def process_multiple_documents(self,
+                                   file_paths: List[str],
+                                   product_types: Dict[str, str] = None,
+                                   max_workers: Optional[int] = None,
+                                   progress_callback: Callable[[str, Optional[Exception]], None] = None) -> Iterator[Document]:
+        product_types = product_types or {}
+        tasks = [
+            (file_path, "process_document", (file_path, product_types.get(file_path)))
+            for file_path in file_paths
+        ]
+        return self._process_tasks(tasks, max_workers, progress_callback)
+    
+    def process_multiple_document_bytes(self,
+                                        files: List[Tuple[str, bytes]],
+                                        product_types: Dict[str, str] = None,
+                                        max_workers: Optional[int] = None,
+                                        progress_callback: Callable[[str, Optional[Exception]], None] = None) -> Iterator[Document]:
+        product_types = product_types or {}
+        tasks = [
+            (filename, "process_document_bytes", (data, filename, product_types.get(filename)))
+            for filename, data in files
+        ]
+        return self._process_tasks(tasks, max_workers, progress_callback)
+    
+    def _get_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        # One long-lived pool per processor; workers pay their imports once,
+        # not on every upload. It is only rebuilt to grow. Workers are
+        # spawned rather than forked from the multithreaded Streamlit server,
+        # and spawned pools start them on demand, so a smaller upload never
+        # starts more workers than it has files.
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers < max_workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(
+                        self.text_splitter._chunk_size,
+                        self.text_splitter._chunk_overlap,
+                        self.cache_dir,
+                        self.max_cache_bytes
+                    )
+                )
+                self._pool_workers = max_workers
+            return self._pool
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        # A crashed worker poisons the pool; drop it so the next upload
+        # starts a fresh one.
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+                self._pool_workers = 0
+    
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                self._pool_workers = 0
+    
+    def _process_tasks(self, tasks, max_workers, progress_callback) -> Iterator[Document]:
+        if not tasks:
+            return
         
-        for file_path in file_paths:
+        if max_workers is None:
+            max_workers = self.max_workers or os.cpu_count() or 1
+        max_workers = min(max_workers, len(tasks))
+        
+        if max_workers == 1:
+            results = self._run_in_process(tasks)
+        else:
+            results = self._run_in_pool(tasks, max_workers)
+        
+        for name, documents, error in results:
+            if error is None:
+                print(f"Processed {len(documents)} chunks from {os.path.basename(name)}")
+            else:
+                print(f"Error processing {name}: {error}")
+            
+            yield from documents
+            
+            if progress_callback:
+                progress_callback(name, error)
+    
+    def _run_in_process(self, tasks):
+        for name, method_name, args in tasks:
             try:
-                product_type = None
-                if product_types and file_path in product_types:
-                    product_type = product_types[file_path]
-                
-                documents = self.process_document(file_path, product_type)
-                all_documents.extend(documents)
-                print(f"Processed {len(documents)} chunks from {os.path.basename(file_path)}")
-                
+                yield name, getattr(self, method_name)(*args), None
             except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-                continue
+                yield name, [], e
+    
+    def _run_in_pool(self, tasks, max_workers: int):
+        pool = self._get_pool(max_workers)
+        futures = {
+            pool.submit(_run_in_worker, method_name, args): name
+            for name, method_name, args in tasks
+        }
         
-        return all_documents
\ No newline at end of file
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, future.result(), None
+            except BrokenProcessPool as e:
+                self._discard_pool(pool)
+                yield name, [], e
+            except Exception as e:
+                yield name, [], e
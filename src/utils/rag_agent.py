@@ -1,4 +1,7 @@
 import os
+import asyncio
+import textwrap
+import threading
 from typing import List, Dict, Any, Optional
 from langchain.llms import OpenAI
 from langchain.chat_models import ChatOpenAI
@@ -6,13 +9,18 @@ from langchain.schema import Document
 from langchain.prompts import PromptTemplate
 from langchain.chains import RetrievalQA
 from dotenv import load_dotenv
+from .semantic_cache import SemanticCache
 
 load_dotenv()
 
 class RAGAgent:
-    def __init__(self, vector_store_manager, model_name: str = "gpt-3.5-turbo"):
+    def __init__(self,
+                 vector_store_manager,
+                 model_name: str = "gpt-3.5-turbo",
+                 semantic_cache: Optional[SemanticCache] = None):
         self.vector_store = vector_store_manager
         self.model_name = model_name
+        self.semantic_cache = semantic_cache if semantic_cache is not None else SemanticCache()
         
         try:
             self.llm = ChatOpenAI(
@@ -25,6 +33,12 @@ class RAGAgent:
             self.llm = None
         
         self.prompt_template = self._create_prompt_template()
+        
+        # One event loop for the agent's lifetime. The async OpenAI client
+        # keeps pooled connections bound to the loop that opened them, so
+        # every session submits to this loop instead of starting its own.
+        self._loop = None
+        self._loop_lock = threading.Lock()
     
     def _create_prompt_template(self) -> PromptTemplate:
         template = """You are a helpful assistant that provides step-by-step procedures based on product manuals and Standard Operating Procedures (SOPs).
@@ -52,88 +66,190 @@ Answer:"""
     def retrieve_relevant_documents(self, 
                                   query: str, 
                                   product_filter: str = None, 
-                                  k: int = 5) -> List[Document]:
+                                  k: int = 5,
+                                  query_vec: Optional[List[float]] = None) -> List[Document]:
         return self.vector_store.search_documents(
             query=query,
             k=k,
-            product_filter=product_filter
+            product_filter=product_filter,
+            query_vec=query_vec
         )
     
-    def format_context(self, documents: List[Document]) -> str:
+    def format_context(self, documents: List[Document], max_chars_per_chunk: int = 1200) -> str:
         if not documents:
             return "No relevant documents found."
         
-        context_parts = []
+        parts = []
         for i, doc in enumerate(documents, 1):
             metadata = doc.metadata
             source = metadata.get('source', 'Unknown')
             product_type = metadata.get('product_type', 'Unknown')
             
-            context_part = f"""
-Document {i}:
-Source: {source} (Product: {product_type})
-Content: {doc.page_content}
----"""
-            context_parts.append(context_part)
-        
-        return "\n".join(context_parts)
+            content = doc.page_content
+            if len(content) > max_chars_per_chunk:
+                content = textwrap.shorten(content, width=max_chars_per_chunk, placeholder=" ...")
+            
+            parts.append(f"[{i}] {source} ({product_type})\n{content}\n")
+        
+        return "".join(parts)
+    
+    def _error_result(self, message: str, product_filter: str = None) -> Dict[str, Any]:
+        return {
+            "answer": message,
+            "sources": [],
+            "product_filter": product_filter
+        }
+    
+    def _no_documents_result(self, query: str, product_filter: str = None) -> Dict[str, Any]:
+        return self._error_result(
+            f"I couldn't find relevant information in the uploaded documents for your query about: '{query}'. Please make sure you have uploaded the appropriate manuals or SOPs, or try rephrasing your question.",
+            product_filter
+        )
+    
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        try:
+            return self.vector_store.embeddings.embed_query(query)
+        except Exception as e:
+            print(f"Error embedding query for semantic cache: {e}")
+            return None
+    
+    def _cache_lookup(self, query_embedding: List[float], product_filter: str, k: int) -> Optional[Dict[str, Any]]:
+        try:
+            return self.semantic_cache.lookup(query_embedding, product_filter, k)
+        except Exception as e:
+            print(f"Error probing semantic cache: {e}")
+            return None
+    
+    def _build_prompt(self, query: str, relevant_docs: List[Document]) -> str:
+        return self.prompt_template.format(
+            context=self.format_context(relevant_docs),
+            question=query
+        )
+    
+    def _answer_result(self,
+                       response: str,
+                       relevant_docs: List[Document],
+                       product_filter: str,
+                       k: int,
+                       query_embedding: Optional[List[float]]) -> Dict[str, Any]:
+        sources = []
+        for doc in relevant_docs:
+            metadata = doc.metadata
+            sources.append({
+                "source": metadata.get('source', 'Unknown'),
+                "product_type": metadata.get('product_type', 'Unknown'),
+                "chunk_index": metadata.get('chunk_index', 0)
+            })
+        
+        result = {
+            "answer": response.strip(),
+            "sources": sources,
+            "product_filter": product_filter,
+            "num_sources": len(relevant_docs)
+        }
+        
+        if query_embedding is not None:
+            try:
+                self.semantic_cache.insert(query_embedding, product_filter, k, result)
+            except Exception as e:
+                print(f"Error updating semantic cache: {e}")
+        
+        return result
     
     def generate_answer(self, 
                        query: str, 
                        product_filter: str = None, 
                        k: int = 5) -> Dict[str, Any]:
         if not self.llm:
-            return {
-                "answer": "Error: Language model not available. Please check your OpenAI API key.",
-                "sources": [],
-                "product_filter": product_filter
-            }
+            return self._error_result(
+                "Error: Language model not available. Please check your OpenAI API key.",
+                product_filter
+            )
+        
+        query_embedding = self._embed_query(query)
+        
+        if query_embedding is not None:
+            cached = self._cache_lookup(query_embedding, product_filter, k)
+            if cached is not None:
+                return {**cached, "cached": True}
         
         relevant_docs = self.retrieve_relevant_documents(
             query=query,
             product_filter=product_filter,
-            k=k
+            k=k,
+            query_vec=query_embedding
         )
         
         if not relevant_docs:
-            return {
-                "answer": f"I couldn't find relevant information in the uploaded documents for your query about: '{query}'. Please make sure you have uploaded the appropriate manuals or SOPs, or try rephrasing your question.",
-                "sources": [],
-                "product_filter": product_filter
-            }
-        
-        context = self.format_context(relevant_docs)
+            return self._no_documents_result(query, product_filter)
         
         try:
-            prompt = self.prompt_template.format(
-                context=context,
-                question=query
-            )
-            
+            prompt = self._build_prompt(query, relevant_docs)
             response = self.llm.predict(prompt)
+            return self._answer_result(response, relevant_docs, product_filter, k, query_embedding)
             
-            sources = []
-            for doc in relevant_docs:
-                metadata = doc.metadata
-                sources.append({
-                    "source": metadata.get('source', 'Unknown'),
-                    "product_type": metadata.get('product_type', 'Unknown'),
-                    "chunk_index": metadata.get('chunk_index', 0)
-                })
-            
-            return {
-                "answer": response.strip(),
-                "sources": sources,
-                "product_filter": product_filter,
-                "num_sources": len(relevant_docs)
-            }
+        except Exception as e:
+            return self._error_result(f"Error generating response: {str(e)}", product_filter)
+    
+    async def agenerate_answer(self,
+                               query: str,
+                               product_filter: str = None,
+                               k: int = 5) -> Dict[str, Any]:
+        if not self.llm:
+            return self._error_result(
+                "Error: Language model not available. Please check your OpenAI API key.",
+                product_filter
+            )
+        
+        query_embedding = await asyncio.to_thread(self._embed_query, query)
+        
+        # Retrieval is started alongside the cache probe rather than after a
+        # miss; on a hit its result is simply discarded.
+        retrieval = asyncio.to_thread(
+            self.retrieve_relevant_documents, query, product_filter, k, query_embedding
+        )
+        if query_embedding is not None:
+            cached, relevant_docs = await asyncio.gather(
+                asyncio.to_thread(self._cache_lookup, query_embedding, product_filter, k),
+                retrieval
+            )
+            if cached is not None:
+                return {**cached, "cached": True}
+        else:
+            relevant_docs = await retrieval
+        
+        if not relevant_docs:
+            return self._no_documents_result(query, product_filter)
+        
+        try:
+            prompt = self._build_prompt(query, relevant_docs)
+            message = await self.llm.ainvoke(prompt)
+            return self._answer_result(message.content, relevant_docs, product_filter, k, query_embedding)
             
         except Exception as e:
-            return {
-                "answer": f"Error generating response: {str(e)}",
-                "sources": [],
-                "product_filter": product_filter
-            }
+            return self._error_result(f"Error generating response: {str(e)}", product_filter)
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="rag-agent-loop",
+                    daemon=True
+                ).start()
+            return self._loop
+    
+    def run_answer(self,
+                   query: str,
+                   product_filter: str = None,
+                   k: int = 5) -> Dict[str, Any]:
+        """Run agenerate_answer on the agent's loop and wait for the result."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.agenerate_answer(query=query, product_filter=product_filter, k=k),
+            self._get_loop()
+        )
+        return future.result()
     
     def get_product_specific_help(self, product_type: str) -> str:
         help_text = {
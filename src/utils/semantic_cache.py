@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import atexit
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+class SemanticCache:
+    def __init__(self,
+                 cache_path: str = "./data/semantic_cache.npz",
+                 threshold: float = 0.95,
+                 max_entries: int = 1024,
+                 save_every: int = 32,
+                 save_interval: float = 300.0):
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.save_interval = save_interval
+
+        # Shared by every Streamlit session, so all state below is guarded.
+        self._lock = threading.Lock()
+        # Serializes file writes with clear() so a late flush cannot
+        # resurrect a cache that was just cleared.
+        self._save_lock = threading.Lock()
+
+        # key -> (normalized embedding, (product_filter, k), result), oldest first
+        self._entries = OrderedDict()
+        self._next_key = 0
+        self._matrix = None
+        self._keys = []
+        self._scopes = []
+
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+        self._load()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _rebuild_index(self):
+        self._keys = list(self._entries)
+        self._scopes = [self._entries[key][1] for key in self._keys]
+        if self._keys:
+            self._matrix = np.stack([self._entries[key][0] for key in self._keys])
+        else:
+            self._matrix = None
+
+    def lookup(self, embedding: List[float], product_filter: Optional[str], k: int) -> Optional[Dict[str, Any]]:
+        query_vec = self._normalize(embedding)
+        scope = (product_filter, k)
+
+        with self._lock:
+            if not self._entries:
+                return None
+
+            if self._matrix is None:
+                self._rebuild_index()
+
+            if query_vec.shape[0] != self._matrix.shape[1]:
+                return None
+
+            scores = self._matrix @ query_vec
+            mask = np.array([s == scope for s in self._scopes])
+            scores = np.where(mask, scores, -np.inf)
+
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            key = self._keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][2]
+
+    def insert(self, embedding: List[float], product_filter: Optional[str], k: int, result: Dict[str, Any]):
+        vec = self._normalize(embedding)
+
+        with self._lock:
+            if self._entries:
+                dim = next(iter(self._entries.values()))[0].shape[0]
+                if dim != vec.shape[0]:
+                    # Embedding model changed; old vectors are not comparable.
+                    self._entries.clear()
+
+            self._entries[self._next_key] = (vec, (product_filter, k), result)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+            self._matrix = None
+            self._unsaved += 1
+            due = (self._unsaved >= self.save_every
+                   or time.monotonic() - self._last_save >= self.save_interval)
+
+        # Rewriting the file on every answer is too costly for the request
+        # path; persist in batches and once more at exit.
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                entries = list(self._entries.values())
+                self._unsaved = 0
+                self._last_save = time.monotonic()
+            self._save(entries)
+
+    def clear(self):
+        with self._save_lock:
+            with self._lock:
+                self._entries.clear()
+                self._matrix = None
+                self._unsaved = 0
+            try:
+                if os.path.exists(self.cache_path):
+                    os.remove(self.cache_path)
+            except Exception as e:
+                print(f"Error clearing semantic cache: {e}")
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                embeddings = data["embeddings"]
+                scopes = json.loads(str(data["scopes"]))
+                results = json.loads(str(data["results"]))
+
+            for vec, (product_filter, k), result in zip(embeddings, scopes, results):
+                self._entries[self._next_key] = (vec, (product_filter, k), result)
+                self._next_key += 1
+        except Exception as e:
+            print(f"Error loading semantic cache: {e}")
+            self._entries.clear()
+
+    def _save(self, entries):
+        if not entries:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    embeddings=np.stack([entry[0] for entry in entries]),
+                    scopes=np.array(json.dumps([list(entry[1]) for entry in entries])),
+                    results=np.array(json.dumps([entry[2] for entry in entries]))
+                )
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Error saving semantic cache: {e}")
@@ -0,0 +1,133 @@
+import re
+import numpy as np
+from bisect import bisect_left, bisect_right
+from typing import List
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Separator classes in priority order, matching the separators the
+# recursive splitter was configured with: paragraphs, lines, sentence
+# ends, clauses, words.
+SEPARATOR_PATTERN = re.compile(r"(\n\n)|(\n)|([.!?])|(,)|( )")
+
+def pack_offsets(all_offsets, kind_offsets, kind_ptr, n_chars, chunk_size, overlap):
+    """Greedily pack separator offsets into (start, end) chunk windows.
+
+    all_offsets holds every boundary in text order. kind_offsets holds the
+    same boundaries grouped by separator class in priority order, with the
+    group for class i at kind_offsets[kind_ptr[i]:kind_ptr[i + 1]].
+    """
+    num_kinds = len(kind_ptr) - 1
+    half = chunk_size // 2
+
+    windows = []
+    start = 0
+    while start < n_chars:
+        limit = start + chunk_size
+        if limit >= n_chars:
+            end = n_chars
+        else:
+            # Prefer the highest-priority boundary in the back half of the
+            # window, then any boundary at all, then a hard cut.
+            end = -1
+            min_end = start + half
+            for kind in range(num_kinds):
+                lo = kind_ptr[kind]
+                i = bisect_right(kind_offsets, limit, lo, kind_ptr[kind + 1]) - 1
+                if i >= lo and kind_offsets[i] > min_end:
+                    end = kind_offsets[i]
+                    break
+            if end < 0:
+                for kind in range(num_kinds):
+                    lo = kind_ptr[kind]
+                    i = bisect_right(kind_offsets, limit, lo, kind_ptr[kind + 1]) - 1
+                    if i >= lo and kind_offsets[i] > start:
+                        end = kind_offsets[i]
+                        break
+            if end < 0:
+                end = limit
+
+        windows.append((start, end))
+        if end >= n_chars:
+            break
+
+        # Step back by the overlap and snap forward to the next boundary
+        # so the following chunk starts on a separator, not mid-word.
+        next_start = end - overlap
+        if next_start <= start:
+            next_start = end
+        else:
+            i = bisect_left(all_offsets, next_start)
+            if i < len(all_offsets) and all_offsets[i] < end:
+                next_start = all_offsets[i]
+            else:
+                next_start = end
+        start = next_start
+
+    return windows
+
+class FastSplitter(RecursiveCharacterTextSplitter):
+    """Single-pass replacement for RecursiveCharacterTextSplitter.
+
+    Candidate boundaries are collected in one vectorized pass over the
+    text and packed into chunks by pack_offsets, which prefers the
+    highest-priority separator in the back half of each window instead of
+    recursing over the text.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, **kwargs):
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap, **kwargs)
+        self._num_kinds = SEPARATOR_PATTERN.groups
+
+    def _find_boundaries(self, text: str):
+        # Offsets just past each separator, in text order, plus the same
+        # offsets grouped by separator class (CSR-style via kind_ptr).
+        # Computed with numpy over the code points rather than a Python
+        # loop over regex matches; the result is identical to
+        # SEPARATOR_PATTERN.finditer.
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+        # A run of n newlines matches as n // 2 "\n\n" separators followed
+        # by one "\n" if n is odd, because the regex prefers the longer
+        # alternative and does not overlap matches.
+        is_newline = np.concatenate(([0], (codes == 10).view(np.uint8), [0])).astype(np.int8)
+        edges = np.diff(is_newline)
+        run_starts = np.flatnonzero(edges == 1)
+        run_lengths = np.flatnonzero(edges == -1) - run_starts
+
+        pairs = run_lengths // 2
+        pair_index = np.arange(pairs.sum()) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+        paragraph_ends = np.repeat(run_starts, pairs) + 2 * (pair_index + 1)
+        odd = run_lengths % 2 == 1
+        line_ends = run_starts[odd] + run_lengths[odd]
+
+        groups = [
+            paragraph_ends,
+            line_ends,
+            np.flatnonzero((codes == 46) | (codes == 33) | (codes == 63)) + 1,
+            np.flatnonzero(codes == 44) + 1,
+            np.flatnonzero(codes == 32) + 1,
+        ]
+
+        kind_offsets = np.concatenate(groups).astype(np.int64)
+        all_offsets = np.sort(kind_offsets)
+        kind_ptr = np.zeros(self._num_kinds + 1, dtype=np.int64)
+        kind_ptr[1:] = np.cumsum([len(group) for group in groups])
+        return all_offsets, kind_offsets, kind_ptr
+
+    def split_text(self, text: str) -> List[str]:
+        n_chars = len(text)
+        if n_chars == 0:
+            return []
+
+        all_offsets, kind_offsets, kind_ptr = self._find_boundaries(text)
+        windows = pack_offsets(
+            all_offsets, kind_offsets, kind_ptr,
+            n_chars, self._chunk_size, self._chunk_overlap
+        )
+
+        chunks = []
+        for start, end in windows:
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+        return chunks
@@ -1,19 +1,101 @@
 import os
+import json
+import hashlib
+import platform
+import sqlite3
+import threading
 import chromadb
-from typing import List, Dict, Any, Optional
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Set
 from langchain.schema import Document
 from langchain.vectorstores import Chroma
 from langchain.embeddings.openai import OpenAIEmbeddings
-from sentence_transformers import SentenceTransformer
+
+def _document_id(document: Document) -> str:
+    # Content-addressed ids: re-uploading a file collapses onto its existing
+    # chunks, while the same paragraph in two different files is kept once
+    # per file so each keeps its own source and chunk_index.
+    source = document.metadata.get("source", "")
+    product_type = document.metadata.get("product_type", "")
+    content = f"{source}\0{product_type}\0{document.page_content}".encode("utf-8")
+    return hashlib.blake2b(content).hexdigest()[:16]
+
+def _dedupe_documents(documents: List[Document]):
+    texts, metadatas, ids = [], [], []
+    seen = set()
+    for document in documents:
+        doc_id = _document_id(document)
+        if doc_id in seen:
+            continue
+        seen.add(doc_id)
+        texts.append(document.page_content)
+        metadatas.append(document.metadata)
+        ids.append(doc_id)
+    return texts, metadatas, ids
+
+class EmbeddingCache:
+    """LRU cache of query embeddings in front of an embeddings backend."""
+    
+    def __init__(self, embeddings, maxsize: int = 2048, normalize: bool = False):
+        self.embeddings = embeddings
+        self.maxsize = maxsize
+        self.normalize = normalize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name):
+        return getattr(self.embeddings, name)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query_array(self, text: str) -> np.ndarray:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            vec = self._cache.get(key)
+            if vec is not None:
+                self._cache.move_to_end(key)
+                return vec
+        
+        vec = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        if self.normalize:
+            norm = np.linalg.norm(vec)
+            if norm:
+                vec = vec / norm
+        vec.setflags(write=False)
+        
+        with self._lock:
+            self._cache[key] = vec
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return vec
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_query_array(text).tolist()
+
+LOCAL_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
 class VectorStoreManager:
-    def __init__(self, persist_directory: str = "./data/vectorstore", use_openai: bool = True):
+    def __init__(self,
+                 persist_directory: str = "./data/vectorstore",
+                 use_openai: bool = True,
+                 onnx_model_dir: str = "./data/onnx/all-MiniLM-L6-v2-int8",
+                 backend: str = "chroma",
+                 sqlite_path: str = "./data/store.sqlite"):
+        if backend not in ("chroma", "sqlite_vec"):
+            raise ValueError(f"Unknown vector store backend: {backend}")
+        
         self.persist_directory = persist_directory
         self.use_openai = use_openai
+        self.onnx_model_dir = onnx_model_dir
+        self.backend = backend
+        self.sqlite_path = sqlite_path
         
         if use_openai:
             try:
-                self.embeddings = OpenAIEmbeddings()
+                # Send up to 1000 texts per embeddings request.
+                self.embeddings = OpenAIEmbeddings(chunk_size=1000)
             except Exception as e:
                 print(f"OpenAI embeddings failed: {e}, falling back to local model")
                 self.use_openai = False
@@ -21,10 +103,32 @@ class VectorStoreManager:
         else:
             self.embeddings = self._get_local_embeddings()
         
+        # Local vectors are pre-normalized so cosine similarity is a dot product.
+        self._prenormalized = not self.use_openai
+        self.embeddings = EmbeddingCache(self.embeddings, normalize=self._prenormalized)
+        
         self.vectorstore = None
-        self._initialize_vectorstore()
+        self.sqlite_store = None
+        # Guards the flat search index, which every session shares.
+        self._index_lock = threading.Lock()
+        if backend == "sqlite_vec":
+            try:
+                self.sqlite_store = SqliteVecStore(sqlite_path, self.embeddings)
+            except Exception as e:
+                print(f"Error initializing sqlite-vec store: {e}, falling back to Chroma")
+                self.backend = "chroma"
+        
+        if self.sqlite_store is None:
+            self._initialize_vectorstore()
     
     def _get_local_embeddings(self):
+        try:
+            return self._get_onnx_embeddings()
+        except Exception as e:
+            print(f"ONNX embeddings unavailable: {e}, falling back to sentence-transformers")
+        
+        # Imported here so the ONNX path never loads torch.
+        from sentence_transformers import SentenceTransformer
         model = SentenceTransformer('all-MiniLM-L6-v2')
         
         class LocalEmbeddings:
@@ -32,15 +136,98 @@ class VectorStoreManager:
                 self.model = model
             
             def embed_documents(self, texts: List[str]) -> List[List[float]]:
-                return self.model.encode(texts).tolist()
+                return self.model.encode(
+                    texts,
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                ).tolist()
             
             def embed_query(self, text: str) -> List[float]:
-                return self.model.encode([text])[0].tolist()
+                return self.model.encode(
+                    [text],
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )[0].tolist()
         
         return LocalEmbeddings(model)
     
+    def _export_onnx_model(self):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        print(f"Exporting {LOCAL_MODEL_NAME} to int8 ONNX in {self.onnx_model_dir}...")
+        model = ORTModelForFeatureExtraction.from_pretrained(LOCAL_MODEL_NAME, export=True)
+        
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(save_dir=self.onnx_model_dir, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(LOCAL_MODEL_NAME).save_pretrained(self.onnx_model_dir)
+    
+    def _get_onnx_embeddings(self):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        if not os.path.exists(os.path.join(self.onnx_model_dir, "model_quantized.onnx")):
+            self._export_onnx_model()
+        
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            self.onnx_model_dir,
+            file_name="model_quantized.onnx",
+            provider="CPUExecutionProvider"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(self.onnx_model_dir)
+        
+        class ONNXEmbeddings:
+            def __init__(self, model, tokenizer, batch_size: int = 64, max_length: int = 256):
+                self.model = model
+                self.tokenizer = tokenizer
+                self.batch_size = batch_size
+                self.max_length = max_length
+            
+            def _encode(self, texts: List[str]) -> np.ndarray:
+                batches = []
+                for start in range(0, len(texts), self.batch_size):
+                    inputs = self.tokenizer(
+                        texts[start:start + self.batch_size],
+                        padding=True,
+                        truncation=True,
+                        max_length=self.max_length,
+                        return_tensors="np"
+                    )
+                    hidden = self.model(**inputs).last_hidden_state
+                    
+                    # Mean-pool over real tokens, then L2-normalize, as the
+                    # sentence-transformers pipeline for this model does.
+                    mask = inputs["attention_mask"][..., None].astype(np.float32)
+                    pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+                    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+                    batches.append(pooled / np.clip(norms, 1e-12, None))
+                
+                if not batches:
+                    return np.empty((0, 0), dtype=np.float32)
+                return np.concatenate(batches).astype(np.float32)
+            
+            def embed_documents(self, texts: List[str]) -> List[List[float]]:
+                return self._encode(texts).tolist()
+            
+            def embed_query(self, text: str) -> List[float]:
+                return self._encode([text])[0].tolist()
+        
+        return ONNXEmbeddings(model, tokenizer)
+    
     def _initialize_vectorstore(self):
         os.makedirs(self.persist_directory, exist_ok=True)
+        self._invalidate_matrix()
+        self._doc_count: int = 0
+        self._products: Set[str] = set()
         
         try:
             self.vectorstore = Chroma(
@@ -50,85 +237,263 @@ class VectorStoreManager:
         except Exception as e:
             print(f"Error initializing vectorstore: {e}")
             self.vectorstore = None
+            return
+        
+        # The sidebar reads these on every rerun, so scan the collection once
+        # here and keep them up to date in _add_batch.
+        try:
+            collection = self.vectorstore._collection
+            self._doc_count = collection.count()
+            results = collection.get(include=["metadatas"])
+            for metadata in results.get("metadatas") or []:
+                if metadata and "product_type" in metadata:
+                    self._products.add(metadata["product_type"])
+        except Exception as e:
+            print(f"Error loading vectorstore stats: {e}")
     
-    def add_documents(self, documents: List[Document]) -> bool:
-        if not self.vectorstore:
+    def _add_batch(self, documents: List[Document]) -> int:
+        if self.sqlite_store is not None:
+            return self.sqlite_store.add_documents(documents)
+        
+        texts, metadatas, ids = _dedupe_documents(documents)
+        
+        # Chroma ignores ids it already holds; skip them here so they are not
+        # re-embedded and the cached count stays exact.
+        existing = set(self.vectorstore._collection.get(ids=ids, include=[])["ids"])
+        if existing:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in existing]
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            ids = [ids[i] for i in keep]
+        if not ids:
+            return 0
+        
+        self.vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+        self._invalidate_matrix()
+        self._doc_count += len(ids)
+        self._products.update(
+            metadata["product_type"] for metadata in metadatas if "product_type" in metadata
+        )
+        return len(ids)
+    
+    def _is_ready(self) -> bool:
+        return self.vectorstore is not None or self.sqlite_store is not None
+    
+    def _persist(self):
+        if self.vectorstore is not None:
+            self.vectorstore.persist()
+    
+    def add_documents(self, documents: List[Document], batch_size: int = 256) -> bool:
+        if not self._is_ready():
             print("Vectorstore not initialized")
             return False
         
         try:
-            self.vectorstore.add_documents(documents)
-            self.vectorstore.persist()
-            print(f"Added {len(documents)} documents to vectorstore")
+            added = 0
+            for start in range(0, len(documents), batch_size):
+                added += self._add_batch(documents[start:start + batch_size])
+            self._persist()
+            print(f"Added {added} documents to vectorstore")
+            return True
+        except Exception as e:
+            print(f"Error adding documents: {e}")
+            return False
+    
+    def add_documents_batched(self, documents: Iterable[Document], batch_size: int = 256) -> bool:
+        if not self._is_ready():
+            print("Vectorstore not initialized")
+            return False
+        
+        try:
+            added = 0
+            batch = []
+            for document in documents:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    added += self._add_batch(batch)
+                    batch = []
+            
+            if batch:
+                added += self._add_batch(batch)
+            
+            self._persist()
+            print(f"Added {added} documents to vectorstore")
             return True
         except Exception as e:
             print(f"Error adding documents: {e}")
             return False
     
+    def _invalidate_matrix(self):
+        with self._index_lock:
+            self._index = None
+    
+    def _build_matrix(self):
+        # Chroma stays the source of truth on disk; searches run over an
+        # in-memory copy of its L2-normalized vectors.
+        results = self.vectorstore._collection.get(
+            include=["embeddings", "documents", "metadatas"]
+        )
+        embeddings = results.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return np.empty((0, 0), dtype=np.float32), [], {}
+        
+        matrix = self._unit_rows(np.asarray(embeddings, dtype=np.float32))
+        
+        metadatas = [metadata or {} for metadata in results["metadatas"]]
+        docs = [
+            Document(page_content=content, metadata=metadata)
+            for content, metadata in zip(results["documents"], metadatas)
+        ]
+        products = np.array(
+            [metadata.get("product_type") for metadata in metadatas], dtype=object
+        )
+        masks = {product: products == product for product in set(products.tolist())}
+        return matrix, docs, masks
+    
+    def _get_index(self):
+        # Searches read one (matrix, docs, product masks) snapshot that is
+        # never modified after it is published. _add_batch drops it once
+        # Chroma has the new rows, and the next search rebuilds it here.
+        with self._index_lock:
+            if self._index is None:
+                self._index = self._build_matrix()
+            return self._index
+    
+    def _unit_rows(self, matrix: np.ndarray) -> np.ndarray:
+        # Local embeddings are normalized when they are produced, so only the
+        # OpenAI path pays for the norms here. Keep float32 C order so the
+        # matmuls go straight to BLAS.
+        if not self._prenormalized:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+    
+    def _top_k(self,
+               scores: np.ndarray,
+               docs: List[Document],
+               masks: Dict[str, np.ndarray],
+               k: int,
+               product_filter: Optional[str],
+               score_threshold: Optional[float]) -> List[Document]:
+        if product_filter:
+            mask = masks.get(product_filter)
+            if mask is None:
+                return []
+            scores = np.where(mask, scores, -np.inf)
+        
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        # score_threshold is a Chroma (squared L2) distance; for unit vectors
+        # that distance is 2 - 2 * cosine. Rows masked out by the product
+        # filter have infinite distance and are always dropped.
+        distances = 2.0 - 2.0 * scores[top]
+        if score_threshold is None:
+            keep = top[np.isfinite(distances)]
+        else:
+            keep = top[distances <= score_threshold]
+        return [docs[i] for i in keep]
+    
+    def _flat_search(self,
+                     query: str,
+                     k: int,
+                     product_filter: Optional[str],
+                     score_threshold: Optional[float],
+                     query_vec: Optional[List[float]] = None) -> List[Document]:
+        matrix, docs, masks = self._get_index()
+        if not docs:
+            return []
+        
+        if query_vec is None:
+            query_vec = self.embeddings.embed_query_array(query)
+        query_vec = self._unit_rows(np.asarray(query_vec, dtype=np.float32)[None, :])[0]
+        
+        scores = matrix @ query_vec
+        return self._top_k(scores, docs, masks, k, product_filter, score_threshold)
+    
     def search_documents(self, 
                         query: str, 
                         k: int = 5, 
                         product_filter: str = None,
-                        score_threshold: float = 0.5) -> List[Document]:
-        if not self.vectorstore:
+                        score_threshold: Optional[float] = 0.5,
+                        query_vec: Optional[List[float]] = None) -> List[Document]:
+        if not self._is_ready():
             print("Vectorstore not initialized")
             return []
         
+        if product_filter == "all":
+            product_filter = None
+        
+        if self.sqlite_store is not None:
+            try:
+                return self.sqlite_store.search_documents(
+                    query, k, product_filter, score_threshold, query_vec
+                )
+            except Exception as e:
+                print(f"Error searching documents: {e}")
+                return []
+        
         try:
-            filter_dict = {}
-            if product_filter and product_filter != "all":
-                filter_dict["product_type"] = product_filter
+            return self._flat_search(query, k, product_filter, score_threshold, query_vec)
+        except Exception as e:
+            print(f"Error in flat search: {e}, falling back to Chroma search")
+        
+        try:
+            filter_dict = None
+            if product_filter:
+                filter_dict = {"product_type": product_filter}
             
-            if filter_dict:
+            # Without a threshold there is nothing to filter on, so skip
+            # fetching distances altogether.
+            if score_threshold is None:
+                if query_vec is not None:
+                    return self.vectorstore.similarity_search_by_vector(
+                        query_vec, k=k, filter=filter_dict
+                    )
+                return self.vectorstore.similarity_search(query, k=k, filter=filter_dict)
+            
+            if query_vec is not None:
+                results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    query_vec, k=k, filter=filter_dict
+                )
+            else:
                 results = self.vectorstore.similarity_search_with_score(
                     query, k=k, filter=filter_dict
                 )
-            else:
-                results = self.vectorstore.similarity_search_with_score(query, k=k)
             
-            filtered_results = []
-            for doc, score in results:
-                if score <= score_threshold:
-                    filtered_results.append(doc)
+            if not results:
+                return []
             
-            return filtered_results
+            docs, scores = zip(*results)
+            keep = np.flatnonzero(np.asarray(scores) <= score_threshold)
+            return [docs[i] for i in keep]
             
         except Exception as e:
             print(f"Error searching documents: {e}")
             return []
     
     def get_document_count(self) -> int:
+        if self.sqlite_store is not None:
+            return self.sqlite_store.get_document_count()
         if not self.vectorstore:
             return 0
-        
-        try:
-            collection = self.vectorstore._collection
-            return collection.count()
-        except Exception as e:
-            print(f"Error getting document count: {e}")
-            return 0
+        return self._doc_count
     
     def get_products(self) -> List[str]:
+        if self.sqlite_store is not None:
+            return self.sqlite_store.get_products()
         if not self.vectorstore:
             return []
-        
-        try:
-            collection = self.vectorstore._collection
-            results = collection.get()
-            
-            products = set()
-            if results and 'metadatas' in results:
-                for metadata in results['metadatas']:
-                    if metadata and 'product_type' in metadata:
-                        products.add(metadata['product_type'])
-            
-            return list(products)
-            
-        except Exception as e:
-            print(f"Error getting products: {e}")
-            return []
+        return list(self._products)
     
     def clear_vectorstore(self) -> bool:
+        if self.sqlite_store is not None:
+            return self.sqlite_store.clear_vectorstore()
+        
         try:
             if os.path.exists(self.persist_directory):
                 import shutil
@@ -140,4 +505,181 @@ class VectorStoreManager:
             
         except Exception as e:
             print(f"Error clearing vectorstore: {e}")
-            return False
\ No newline at end of file
+            return False
+
+class SqliteVecStore:
+    """Vector store on a single SQLite file using the sqlite-vec extension.
+    
+    Exposes the same add/search/count/products/clear operations as
+    VectorStoreManager, for corpora small enough that an exact KNN scan
+    in C beats loading Chroma.
+    """
+    
+    def __init__(self, db_path: str, embeddings):
+        self.db_path = db_path
+        self.embeddings = embeddings
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._load_extension()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self._create_tables()
+    
+    def _load_extension(self):
+        self.conn.enable_load_extension(True)
+        try:
+            try:
+                import sqlite_vec
+                sqlite_vec.load(self.conn)
+            except ImportError:
+                self.conn.load_extension("vec0")
+        finally:
+            self.conn.enable_load_extension(False)
+    
+    def _create_tables(self):
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "id INTEGER PRIMARY KEY, doc_id TEXT UNIQUE, source TEXT, "
+            "product_type TEXT, content TEXT, metadata TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS meta_product_type ON meta(product_type)")
+        self.conn.commit()
+        
+        # The vector table is created on first insert, once the embedding
+        # dimension is known (384 for MiniLM, 1536 for OpenAI).
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'chunks'"
+        ).fetchone()
+        self._has_chunks = row is not None
+        
+        # The sidebar reads these on every rerun, so query them once here
+        # and keep them up to date in add_documents.
+        self._doc_count = self.conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0]
+        self._products: Set[str] = {
+            row[0] for row in self.conn.execute(
+                "SELECT DISTINCT product_type FROM meta WHERE product_type IS NOT NULL"
+            )
+        }
+    
+    def _ensure_chunks_table(self, dim: int):
+        if self._has_chunks:
+            return
+        self.conn.execute(
+            f"CREATE VIRTUAL TABLE chunks USING vec0(embedding FLOAT[{dim}], product_type TEXT)"
+        )
+        self._has_chunks = True
+    
+    @staticmethod
+    def _serialize(vector) -> bytes:
+        return np.asarray(vector, dtype=np.float32).tobytes()
+    
+    def add_documents(self, documents: List[Document]) -> int:
+        texts, metadatas, ids = _dedupe_documents(documents)
+        if not ids:
+            return 0
+        
+        with self._lock:
+            placeholders = ",".join("?" * len(ids))
+            existing = {
+                row[0] for row in self.conn.execute(
+                    f"SELECT doc_id FROM meta WHERE doc_id IN ({placeholders})", ids
+                )
+            }
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in existing]
+        if not keep:
+            return 0
+        
+        texts = [texts[i] for i in keep]
+        metadatas = [metadatas[i] for i in keep]
+        ids = [ids[i] for i in keep]
+        vectors = self.embeddings.embed_documents(texts)
+        
+        with self._lock:
+            # One transaction per batch: a failure rolls back every row it
+            # wrote, and INSERT OR IGNORE skips ids that a concurrent upload
+            # stored after the check above.
+            added = []
+            with self.conn:
+                self._ensure_chunks_table(len(vectors[0]))
+                for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                    product_type = metadata.get("product_type")
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO meta (doc_id, source, product_type, content, metadata) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (doc_id, metadata.get("source"), product_type, text, json.dumps(metadata))
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                    self.conn.execute(
+                        "INSERT INTO chunks (rowid, embedding, product_type) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, self._serialize(vector), product_type)
+                    )
+                    added.append(product_type)
+            self._doc_count += len(added)
+            self._products.update(product for product in added if product is not None)
+        
+        return len(added)
+    
+    def search_documents(self,
+                         query: str,
+                         k: int = 5,
+                         product_filter: Optional[str] = None,
+                         score_threshold: Optional[float] = 0.5,
+                         query_vec: Optional[List[float]] = None) -> List[Document]:
+        if not self._has_chunks:
+            return []
+        
+        if query_vec is None:
+            query_vec = self.embeddings.embed_query(query)
+        
+        sql = "SELECT rowid, distance FROM chunks WHERE embedding MATCH ? AND k = ?"
+        params = [self._serialize(query_vec), k]
+        if product_filter:
+            sql += " AND product_type = ?"
+            params.append(product_filter)
+        sql += " ORDER BY distance"
+        
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            if score_threshold is not None:
+                # vec0 reports L2 distance; score_threshold follows Chroma's
+                # squared L2 convention.
+                rows = [(rowid, distance) for rowid, distance in rows
+                        if distance * distance <= score_threshold]
+            if not rows:
+                return []
+            
+            rowids = [rowid for rowid, _ in rows]
+            placeholders = ",".join("?" * len(rowids))
+            found = {
+                row[0]: Document(page_content=row[1], metadata=json.loads(row[2]))
+                for row in self.conn.execute(
+                    f"SELECT id, content, metadata FROM meta WHERE id IN ({placeholders})", rowids
+                )
+            }
+        
+        return [found[rowid] for rowid in rowids if rowid in found]
+    
+    def get_document_count(self) -> int:
+        return self._doc_count
+    
+    def get_products(self) -> List[str]:
+        with self._lock:
+            return list(self._products)
+    
+    def clear_vectorstore(self) -> bool:
+        try:
+            with self._lock:
+                with self.conn:
+                    self.conn.execute("DROP TABLE IF EXISTS chunks")
+                    self.conn.execute("DELETE FROM meta")
+                self._has_chunks = False
+                self._doc_count = 0
+                self._products.clear()
+            print("Vectorstore cleared successfully")
+            return True
+        except Exception as e:
+            print(f"Error clearing vectorstore: {e}")
+            return False
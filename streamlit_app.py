@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-import tempfile
 from pathlib import Path
 from typing import List
 
@@ -20,7 +19,10 @@ def initialize_components():
     """Initialize the RAG components"""
     try:
         processor = DocumentProcessor(chunk_size=1000, chunk_overlap=200)
-        vector_store = VectorStoreManager(persist_directory="./data/vectorstore")
+        vector_store = VectorStoreManager(
+            persist_directory="./data/vectorstore",
+            backend=os.getenv("VECTOR_STORE_BACKEND", "chroma")
+        )
         agent = RAGAgent(vector_store)
         return processor, vector_store, agent
     except Exception as e:
@@ -62,6 +64,7 @@ def main():
             if st.button("Process Documents", type="primary"):
                 if uploaded_files:
                     process_uploaded_files(uploaded_files, selected_product, processor, vector_store)
+                    agent.semantic_cache.clear()
                 else:
                     st.warning("Please upload at least one PDF file")
         
@@ -80,6 +83,8 @@ def main():
             if st.button("Clear All Documents", type="secondary"):
                 if st.confirm("Are you sure you want to clear all documents?"):
                     vector_store.clear_vectorstore()
+                    processor.clear_cache()
+                    agent.semantic_cache.clear()
                     st.success("All documents cleared!")
                     st.rerun()
         
@@ -155,40 +160,60 @@ def process_uploaded_files(uploaded_files, selected_product, processor, vector_s
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    all_documents = []
+    product_type = None if selected_product == "auto-detect" else selected_product
     
-    for i, uploaded_file in enumerate(uploaded_files):
+    files = []
+    file_sizes = {}
+    product_types = {}
+    for uploaded_file in uploaded_files:
         try:
-            status_text.text(f"Processing {uploaded_file.name}...")
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_file_path = tmp_file.name
-            
-            product_type = None if selected_product == "auto-detect" else selected_product
-            
-            documents = processor.process_document(tmp_file_path, product_type)
-            all_documents.extend(documents)
-            
-            os.unlink(tmp_file_path)
-            
-            progress_bar.progress((i + 1) / len(uploaded_files))
+            data = uploaded_file.getvalue()
+            files.append((uploaded_file.name, data))
+            file_sizes[uploaded_file.name] = len(data)
+            if product_type:
+                product_types[uploaded_file.name] = product_type
             
         except Exception as e:
             st.error(f"Error processing {uploaded_file.name}: {e}")
             continue
     
-    if all_documents:
-        status_text.text("Adding documents to vector store...")
-        
-        success = vector_store.add_documents(all_documents)
-        
-        if success:
-            st.success(f"Successfully processed {len(uploaded_files)} files and added {len(all_documents)} document chunks!")
-        else:
-            st.error("Failed to add documents to vector store")
-    else:
+    status_text.text(f"Processing {len(files)} files and adding them to the vector store...")
+    total_bytes = sum(len(data) for _, data in files) or 1
+    processed_bytes = 0
+    num_chunks = 0
+    
+    def on_file_done(filename, error):
+        nonlocal processed_bytes
+        processed_bytes += file_sizes[filename]
+        if error:
+            st.error(f"Error processing {filename}: {error}")
+        progress_bar.progress(min(processed_bytes / total_bytes, 1.0))
+    
+    def count_chunks(documents):
+        nonlocal num_chunks
+        for document in documents:
+            num_chunks += 1
+            yield document
+    
+    documents = processor.process_multiple_document_bytes(
+        files,
+        product_types,
+        progress_callback=on_file_done
+    )
+    count_before = vector_store.get_document_count()
+    success = vector_store.add_documents_batched(count_chunks(documents))
+    # Chunks already in the store are skipped, so report what was stored.
+    num_added = vector_store.get_document_count() - count_before
+    
+    if not num_chunks:
         st.error("No documents were successfully processed")
+    elif success:
+        message = f"Successfully processed {len(uploaded_files)} files and added {num_added} document chunks!"
+        if num_added < num_chunks:
+            message += f" {num_chunks - num_added} chunks were already stored."
+        st.success(message)
+    else:
+        st.error("Failed to add documents to vector store")
     
     progress_bar.empty()
     status_text.empty()
@@ -204,7 +229,7 @@ def ask_question(question, product_filter, agent):
     with st.spinner("Searching documents and generating answer..."):
         search_k = getattr(st.session_state, 'search_k', 5)
         
-        response = agent.generate_answer(
+        response = agent.run_answer(
             query=question,
             product_filter=product_filter if product_filter != "all" else None,
             k=search_k